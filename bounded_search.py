@@ -0,0 +1,224 @@
+import heapq
+import math
+from itertools import count
+from grid import Grid
+from spot import Spot
+from searching_algorithms import h_manhattan_distance, reconstruct_path
+
+class MemoryBoundedAStar:
+    """
+    Simplified Memory-Bounded A* (SMA*).
+    Like A*, but at most `budget` spots are kept in memory, with their cost and their parent. Besides the
+    state array of the grid, the search only uses dicts and heaps of the order of the budget: it uses
+    neither the workspace nor the component labels of the grid, so a walled off end is only found out by
+    running out of spots to generate (or by giving up, see below).
+    A spot stays in memory while one of its children does, so the path to every spot in memory is known.
+    Spots are generated one at a time, the best successor of the best spot first. When the budget is
+    reached, the least promising leaf (highest f, then shallowest) is forgotten: its f is backed up in its
+    parent, which generates it again (with that f) if it becomes the best spot again. The f of every spot
+    is backed up as the lowest f of its successors too, so spots that only lead to expensive paths get
+    expensive.
+
+    A path found this way is the shortest one, unless some spot could not be kept at all because the
+    budget was filled by the path to it (the shortest path is too long for the budget). After every
+    search, `optimal` tells if the path is guaranteed to be the shortest and `dropped` how many spots were
+    forgotten. Successors that cannot be on a path fitting in the budget (a path through them has at
+    least f + 1 spots) are never generated, and the search stops as soon as the start itself does not
+    fit. With a budget just big enough, the same spots can still be forgotten and generated again many
+    times, so a search gives up (returns False, with `gave_up` set) after generating `max_generated` spots.
+    """
+
+    def __init__(self, budget: int = 1000, max_generated: int = 100_000):
+        """
+        Args:
+            budget (int): Maximum number of spots kept in memory, used when a search is not given one.
+            max_generated (int): Number of spots generated (counting every time a spot is generated again)
+                after which a search gives up, so it takes seconds and not hours.
+        """
+        self.budget: int = budget
+        self.max_generated: int = max_generated
+        self.optimal: bool = False  # the path found by the last search is the shortest one
+        self.dropped: int = 0  # number of spots forgotten by the last search
+        self.gave_up: bool = False  # the last search generated too many spots and stopped without a path
+
+    def __call__(self, draw: callable, grid: Grid, start: Spot, end: Spot, heuristic=h_manhattan_distance, budget: int | None = None) -> bool:
+        """
+        Search for a path with at most budget spots in memory.
+        Args:
+            draw (callable): A function to call to update the Pygame window.
+            grid (Grid): The Grid object containing the spots.
+            start (Spot): The starting spot.
+            end (Spot): The ending spot.
+            heuristic (callable): An admissible heuristic, so that the backed up costs are lower bounds.
+            budget (int | None): Maximum number of spots kept in memory, by default self.budget.
+        Returns:
+            bool: True if a path is found, False otherwise.
+        """
+        self.optimal = False
+        self.dropped = 0
+        self.gave_up = False
+        if start is None or end is None:
+            return False
+        budget = max(budget or self.budget, 2)  # the start and one spot at a time
+        goal, root = end.get_position(), start.index
+        complete = True  # False once a spot could not be kept, even after forgetting the others
+        if heuristic(start.get_position(), goal) + 1 > budget:
+            return False  # even the shortest possible path does not fit
+
+        # the spots in memory
+        g = {root: 0}  # cost from the start
+        f = {root: heuristic(start.get_position(), goal)}  # lower bound of a path through the spot, backed up
+        parent = {}
+        children = {root: set()}  # children in memory
+        # successors not in memory (not generated yet, or forgotten) -> their f, for the expanded spots
+        successors = {}
+        queue = []  # (f, -g, count, spot) of the spots that have successors to generate: lowest f, then deepest
+        leaves = []  # (-f, g, count, spot) of the spots without children: highest f, then shallowest
+        order = count()
+        generated = 0
+
+        def queue_push(index: int) -> None:
+            heapq.heappush(queue, (f[index], -g[index], next(order), index))
+
+        def leaves_push(index: int) -> None:
+            heapq.heappush(leaves, (-f[index], g[index], next(order), index))
+
+        def in_queue(index: int) -> bool:
+            # not expanded yet, or some successors are not in memory
+            return index not in successors or len(successors[index]) > 0
+
+        def back_up(index: int) -> None:
+            # the f of a spot is the lowest f of its successors, update it and the f of its ancestors
+            while True:
+                best = min([f[child] for child in children[index]] + list(successors[index].values()), default=math.inf)
+                if best == f[index]:
+                    return
+                f[index] = best
+                if in_queue(index):
+                    queue_push(index)
+                if not children[index]:
+                    leaves_push(index)
+                if index == root:
+                    return
+                index = parent[index]
+
+        def forget(index: int) -> None:
+            # remove a leaf, its parent generates it again if needed
+            if index != end.index:
+                grid.spot_at(index).reset()
+            up = parent.pop(index)
+            children[up].discard(index)
+            if f[index] + 1 <= budget:
+                successors[up][index] = f[index]
+                queue_push(up)
+            if not children[up]:
+                leaves_push(up)
+            del g[index], f[index], children[index]
+            successors.pop(index, None)
+
+        def forget_subtree(index: int) -> None:
+            # remove everything under a spot, without backing up: their costs came from a longer path to it
+            stack = list(children[index])
+            children[index] = set()
+            while stack:
+                child = stack.pop()
+                stack.extend(children.pop(child))
+                if child != end.index:
+                    grid.spot_at(child).reset()
+                del g[child], f[child], parent[child]
+                successors.pop(child, None)
+                self.dropped += 1
+
+        def make_room(keep: int) -> bool:
+            # forget the worst leaf, except the start and the spot being expanded
+            while leaves:
+                worst, _, _, index = heapq.heappop(leaves)
+                if index in g and index != keep and index != root and not children[index] and f[index] == -worst:
+                    forget(index)
+                    self.dropped += 1
+                    return True
+            return False
+
+        queue_push(root)
+        while queue:
+            best, _, _, current = heapq.heappop(queue)
+            if current not in g or f[current] != best or not in_queue(current):
+                continue  # forgotten, or pushed again with another f
+            if best == math.inf or f[root] + 1 > budget:
+                break  # everything left is out of reach within the budget
+
+            if current == end.index:
+                reconstruct_path(draw, grid, parent.__getitem__, start, end)
+                self.optimal = complete
+                return True
+            if generated >= self.max_generated:
+                self.gave_up = True  # the budget is too small to search this map in a reasonable time
+                break
+
+            if current not in successors:
+                # first expansion: f never decreases along a path. A path through a successor has at least
+                # f + 1 spots, the ones that cannot fit in the budget are left out.
+                successors[current] = {}
+                for neighbor in grid.spot_at(current).neighbors:
+                    if neighbor.index != parent.get(current):
+                        neighbor_f = max(f[current], g[current] + 1 + heuristic(neighbor.get_position(), goal))
+                        if neighbor_f + 1 <= budget:
+                            successors[current][neighbor.index] = neighbor_f
+                if current != root:
+                    grid.spot_at(current).make_closed()
+                    draw()
+
+            # generate the best successor that is not in memory
+            pending = successors[current]
+            if not pending:
+                back_up(current)  # a dead end
+                continue
+            index = min(pending, key=pending.__getitem__)
+            index_f = pending.pop(index)
+            new_g = g[current] + 1
+            generated += 1
+            if index in g:
+                if g[index] > new_g:
+                    # shorter path to a spot in memory: move it under this spot
+                    forget_subtree(index)
+                    up = parent[index]
+                    children[up].discard(index)
+                    if not children[up]:
+                        leaves_push(up)
+                    back_up(up)
+                    g[index] = new_g
+                    f[index] = index_f
+                    parent[index] = current
+                    children[current].add(index)
+                    successors.pop(index, None)  # expanded again from the new path
+                    queue_push(index)
+                    leaves_push(index)
+                    if index != end.index:
+                        grid.spot_at(index).make_open()
+            elif new_g + 1 >= budget and index != end.index:
+                complete = False  # the path to this spot fills the budget, nothing under it can ever fit
+            elif len(g) >= budget and not make_room(current):
+                complete = False  # the budget is full with the path to this spot, nothing under it fits
+            else:
+                g[index] = new_g
+                f[index] = index_f
+                parent[index] = current
+                children[index] = set()
+                children[current].add(index)
+                queue_push(index)
+                leaves_push(index)
+                if index != end.index:
+                    grid.spot_at(index).make_open()
+                    draw()
+
+            back_up(current)
+            if in_queue(current):
+                queue_push(current)
+
+            if len(queue) > 4 * budget or len(leaves) > 4 * budget:
+                # drop the stale entries, so the heaps stay within the budget too
+                queue[:] = [(f[i], -g[i], next(order), i) for i in g if in_queue(i)]
+                leaves[:] = [(-f[i], g[i], next(order), i) for i in g if not children[i]]
+                heapq.heapify(queue)
+                heapq.heapify(leaves)
+        return False
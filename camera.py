@@ -0,0 +1,144 @@
+import math
+import pygame
+
+class Camera:
+    # zoom is limited so that the whole grid always fills the window at the smallest zoom
+    # and a spot is never drawn bigger than MAX_SPOT_SIZE pixels at the largest one.
+    MAX_SPOT_SIZE = 64
+
+    def __init__(self, rows: int, cols: int, width: int, height: int):
+        """
+        Initialize a camera (viewport) over a grid, showing the whole grid in the window.
+        Args:
+            rows (int): Number of rows in the grid (they grow along x).
+            cols (int): Number of columns in the grid (they grow along y).
+            width (int): Width of the visible area in pixels.
+            height (int): Height of the visible area in pixels.
+        """
+        self.rows: int = rows
+        self.cols: int = cols
+        self.width: int = width
+        self.height: int = height
+        # size of a spot at zoom 1, when the whole grid fits the window
+        self.base_width: float = width / rows
+        self.base_height: float = height / cols
+        self.max_zoom: float = max(1.0, self.MAX_SPOT_SIZE / min(self.base_width, self.base_height))
+        self.zoom: float = 1.0
+        # position of the top left corner of the view, in pixels of the zoomed grid
+        self.x: float = 0.0
+        self.y: float = 0.0
+
+    @property
+    def spot_width(self) -> float:
+        return self.base_width * self.zoom
+
+    @property
+    def spot_height(self) -> float:
+        return self.base_height * self.zoom
+
+    def reset(self) -> None:
+        """
+        Zoom out to show the whole grid again.
+        Returns:
+            None
+        """
+        self.zoom = 1.0
+        self.x = 0.0
+        self.y = 0.0
+
+    def pan(self, dx: float, dy: float) -> None:
+        """
+        Move the view by the given amount of screen pixels, without leaving the grid.
+        Args:
+            dx (float): Horizontal movement in pixels.
+            dy (float): Vertical movement in pixels.
+        Returns:
+            None
+        """
+        self.x += dx
+        self.y += dy
+        self._clamp()
+
+    def zoom_at(self, factor: float, pos: tuple[int, int]) -> None:
+        """
+        Multiply the zoom by the given factor, keeping the point under pos in place.
+        Args:
+            factor (float): The zoom factor (> 1 zooms in, < 1 zooms out).
+            pos (tuple[int, int]): The (x, y) screen position to zoom around, e.g. the mouse.
+        Returns:
+            None
+        """
+        zoom = min(max(self.zoom * factor, 1.0), self.max_zoom)
+        px, py = pos
+        self.x = (self.x + px) * zoom / self.zoom - px
+        self.y = (self.y + py) * zoom / self.zoom - py
+        self.zoom = zoom
+        self._clamp()
+
+    def _clamp(self) -> None:
+        """
+        Keep the view inside the zoomed grid.
+        Returns:
+            None
+        """
+        self.x = min(max(self.x, 0.0), self.rows * self.spot_width - self.width)
+        self.y = min(max(self.y, 0.0), self.cols * self.spot_height - self.height)
+
+    def visible_spots(self) -> tuple[int, int, int, int]:
+        """
+        Get the range of spots that are (at least partly) inside the view.
+        Returns:
+            tuple[int, int, int, int]: (first row, last row + 1, first col, last col + 1).
+        """
+        first_row = max(int(self.x / self.spot_width), 0)
+        last_row = min(math.ceil((self.x + self.width) / self.spot_width), self.rows)
+        first_col = max(int(self.y / self.spot_height), 0)
+        last_col = min(math.ceil((self.y + self.height) / self.spot_height), self.cols)
+        return first_row, last_row, first_col, last_col
+
+    def to_screen(self, row: int, col: int) -> tuple[int, int]:
+        """
+        Get the screen position of the top left corner of a spot.
+        Args:
+            row (int): The row index of the spot.
+            col (int): The column index of the spot.
+        Returns:
+            tuple[int, int]: The (x, y) position of the spot in the window.
+        """
+        return math.floor(row * self.spot_width - self.x), math.floor(col * self.spot_height - self.y)
+
+    def to_grid(self, pos: tuple[int, int]) -> tuple[int, int]:
+        """
+        Get the spot under a screen position.
+        Args:
+            pos (tuple[int, int]): The (x, y) position in the window.
+        Returns:
+            tuple[int, int]: The (row, col) position of the spot in the grid.
+        """
+        x, y = pos
+        row = math.floor((x + self.x) / self.spot_width)
+        col = math.floor((y + self.y) / self.spot_height)
+        # to_screen floors after subtracting the fractional offset, so the guess can be one spot off on
+        # an edge pixel: take the last row and col whose spot starts at or before the position, like drawn
+        while math.floor(row * self.spot_width - self.x) > x:
+            row -= 1
+        while math.floor((row + 1) * self.spot_width - self.x) <= x:
+            row += 1
+        while math.floor(col * self.spot_height - self.y) > y:
+            col -= 1
+        while math.floor((col + 1) * self.spot_height - self.y) <= y:
+            col += 1
+        return row, col
+
+    def spot_rect(self, row: int, col: int) -> pygame.Rect:
+        """
+        Get the rectangle a spot covers in the window.
+        Args:
+            row (int): The row index of the spot.
+            col (int): The column index of the spot.
+        Returns:
+            pygame.Rect: The rectangle of the spot, in window coordinates.
+        """
+        x, y = self.to_screen(row, col)
+        next_x, next_y = self.to_screen(row + 1, col + 1)
+        return pygame.Rect(x, y, next_x - x, next_y - y)
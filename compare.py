@@ -0,0 +1,219 @@
+import multiprocessing
+import signal
+import time
+from functools import partial
+from bounded_search import MemoryBoundedAStar
+from grid import Grid
+from landmarks import LandmarkHeuristic
+from searching_algorithms import bfs, dfs, astar, dls, greedy, h_euclidian_distance, h_manhattan_distance, ida, iddfs, ucs
+from spot import Spot
+from utils import EMPTY, OPEN, CLOSED, PATH, STATE_COLORS
+import pygame
+
+# Compare mode: every search of COMPARED runs on a copy of the grid in a background process, without drawing.
+# The window stays responsive, a COMPARE_DONE event is posted every time one of them finishes.
+
+COMPARE_DONE = pygame.event.custom_type()
+
+ALGORITHMS = {
+    "BFS": bfs,
+    "DFS": dfs,
+    "A*": astar,
+    "DLS": dls,
+    "UCS": ucs,
+    "Greedy": greedy,
+    "IDDFS": iddfs,
+    "IDA*": ida,
+    "SMA*": MemoryBoundedAStar(),  # with its default node budget
+}
+HEURISTICS = {
+    "Manhattan": lambda grid: h_manhattan_distance,
+    "Euclidean": lambda grid: h_euclidian_distance,
+    "ALT": LandmarkHeuristic,  # the landmark tables are computed in the run, and timed with it
+}
+DEPTH_LIMITED = ("DLS", "IDDFS")
+
+# (algorithm, heuristic) of every run, the slow ones last so the others are not queued behind them
+COMPARED = [
+    ("BFS", None),
+    ("DFS", None),
+    ("UCS", None),
+    ("A*", "Manhattan"),
+    ("A*", "Euclidean"),
+    ("A*", "ALT"),
+    ("Greedy", "Manhattan"),
+    ("Greedy", "Euclidean"),
+    ("Greedy", "ALT"),
+    ("SMA*", "Manhattan"),
+    ("DLS", None),
+    ("IDDFS", None),
+    ("IDA*", "Manhattan"),
+    ("IDA*", "Euclidean"),
+    ("IDA*", "ALT"),
+]
+
+# what is left of a previous run is cleared from the snapshot, barriers, start and end are kept
+_CLEAR_SEARCH = bytes(EMPTY if state in (OPEN, CLOSED, PATH) else state for state in range(256))
+
+class _CountingStates(bytearray):
+    """
+    A state array that counts what the search writes to it: the number of spots marked closed
+    (expanded, every time they are) and the largest number of spots marked open at once (the frontier).
+    """
+
+    def __init__(self, states: bytes):
+        super().__init__(states)
+        self.open: int = self.count(OPEN)
+        self.open_peak: int = self.open
+        self.closed: int = 0
+
+    def __setitem__(self, index, state) -> None:
+        if isinstance(index, int):
+            old = self[index]
+            if state == OPEN and old != OPEN:
+                self.open += 1
+                if self.open > self.open_peak:
+                    self.open_peak = self.open
+            elif old == OPEN and state != OPEN:
+                self.open -= 1
+            if state == CLOSED:
+                self.closed += 1
+        super().__setitem__(index, state)
+
+class CompareResult:
+    """
+    The statistics of one search of the compare mode, and the state array it ended with.
+    """
+
+    def __init__(self, found: bool, time: float, expanded: int, frontier_peak: int, path_length: int, states: bytes):
+        """
+        Args:
+            found (bool): Whether a path was found.
+            time (float): Duration of the search in seconds.
+            expanded (int): Number of times a spot was marked closed.
+            frontier_peak (int): Largest number of spots marked open at the same time.
+            path_length (int): Number of steps of the path, 0 if none was found.
+            states (bytes): The state array at the end of the search.
+        """
+        self.found: bool = found
+        self.time: float = time
+        self.expanded: int = expanded
+        self.frontier_peak: int = frontier_peak
+        self.path_length: int = path_length
+        self.states: bytes = states
+        self._thumbnail: pygame.Surface | None = None
+
+    def thumbnail(self, rows: int, cols: int, size: tuple[int, int]) -> pygame.Surface:
+        """
+        The final exploration of the search as a small image, one pixel per spot scaled to the given size.
+        Args:
+            rows (int): Number of rows in the grid.
+            cols (int): Number of columns in the grid.
+            size (tuple[int, int]): Size of the image in pixels.
+        Returns:
+            pygame.Surface: The image, made once and reused.
+        """
+        if self._thumbnail is None or self._thumbnail.get_size() != size:
+            cells = pygame.image.frombuffer(self.states, (rows, cols), "P")  # like Grid._make_cells_surface
+            cells.set_palette(STATE_COLORS)
+            self._thumbnail = pygame.transform.scale(cells, size)
+        return self._thumbnail
+
+def _init_worker() -> None:
+    # the workers are forked from the window process and inherit the SIGTERM handler of SDL, which only
+    # queues a quit event: put the default one back so stop() can kill them
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+def _run(algorithm: str, heuristic: str | None, states: bytes, rows: int, cols: int, start: int, end: int, depth_limit: int) -> CompareResult:
+    """
+    Run one search on a copy of the grid, without drawing. Called in the worker processes.
+    Args:
+        algorithm (str): Name of the search in ALGORITHMS.
+        heuristic (str | None): Name of the heuristic in HEURISTICS, for the searches that use one.
+        states (bytes): The state array of the grid.
+        rows (int): Number of rows in the grid.
+        cols (int): Number of columns in the grid.
+        start (int): Index of the start spot.
+        end (int): Index of the end spot.
+        depth_limit (int): Depth limit of DLS and IDDFS.
+    Returns:
+        CompareResult: The statistics of the search.
+    """
+    grid = Grid(None, rows, cols, rows, cols)
+    grid.states = _CountingStates(states)
+    grid.barriers_changed()
+    grid.update_components()  # in the background, so the searches can skip a walled off end like in the window
+    start_spot, end_spot = grid.spot_at(start), grid.spot_at(end)
+    search = ALGORITHMS[algorithm]
+    args = (lambda: None, grid, start_spot, end_spot)
+    started = time.perf_counter()
+    if heuristic is not None:
+        found = search(*args, heuristic=HEURISTICS[heuristic](grid))
+    elif algorithm in DEPTH_LIMITED:
+        found = search(*args, depth_limit)
+    else:
+        found = search(*args)
+    elapsed = time.perf_counter() - started
+    counted = grid.states
+    path_length = counted.count(PATH) + 1 if found else 0
+    return CompareResult(found, elapsed, counted.closed, counted.open_peak, path_length, bytes(counted))
+
+class Comparison:
+    """
+    The runs of the compare mode on a snapshot of a grid, searched concurrently by a pool of processes.
+    results[i] is the CompareResult of COMPARED[i] once it finished (None until then), errors[i] the error
+    message if it failed.
+    """
+
+    def __init__(self, grid: Grid, start: Spot, end: Spot, depth_limit: int, runs: list[tuple[str, str | None]] = COMPARED, processes: int | None = None):
+        """
+        Snapshot the grid and start all the runs in the background.
+        Args:
+            grid (Grid): The grid to compare the searches on, it can be changed while they run.
+            start (Spot): The starting spot.
+            end (Spot): The ending spot.
+            depth_limit (int): Depth limit of DLS and IDDFS.
+            runs (list[tuple[str, str | None]]): The (algorithm, heuristic) pairs to run.
+            processes (int | None): Number of worker processes, by default the number of CPUs.
+        """
+        self.rows: int = grid.rows
+        self.cols: int = grid.cols
+        self.runs: list[tuple[str, str | None]] = list(runs)
+        self.results: list[CompareResult | None] = [None] * len(self.runs)
+        self.errors: list[str | None] = [None] * len(self.runs)
+        states = bytes(grid.states).translate(_CLEAR_SEARCH)
+        # a Pool and not a ProcessPoolExecutor: a search that never ends (IDA* on a big open map) has to be killed
+        self._pool = multiprocessing.Pool(processes, initializer=_init_worker)
+        for i, (algorithm, heuristic) in enumerate(self.runs):
+            self._pool.apply_async(
+                _run,
+                (algorithm, heuristic, states, self.rows, self.cols, start.index, end.index, depth_limit),
+                callback=partial(self._finished, i),
+                error_callback=partial(self._failed, i),
+            )
+        self._pool.close()
+
+    # called in the result thread of the pool
+    def _finished(self, i: int, result: CompareResult) -> None:
+        self.results[i] = result
+        pygame.event.post(pygame.event.Event(COMPARE_DONE))
+
+    def _failed(self, i: int, error: BaseException) -> None:
+        self.errors[i] = type(error).__name__
+        pygame.event.post(pygame.event.Event(COMPARE_DONE))
+
+    def label(self, i: int) -> str:
+        algorithm, heuristic = self.runs[i]
+        return f"{algorithm} ({heuristic})" if heuristic else algorithm
+
+    @property
+    def done(self) -> bool:
+        return all(result is not None or error is not None for result, error in zip(self.results, self.errors))
+
+    def stop(self) -> None:
+        """
+        Kill the runs that have not finished yet.
+        Returns:
+            None
+        """
+        self._pool.terminate()
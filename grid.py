@@ -1,8 +1,66 @@
-from utils import COLORS
+from array import array
+from utils import COLORS, EMPTY, BARRIER, STATE_COLORS
+from camera import Camera
 from spot import Spot
+from workspace import SearchWorkspace
+import math
+import re
 import pygame
 
+FREE_RUN = re.compile(b"[^" + bytes([BARRIER]) + b"]+")  # a run of spots that are not barriers
+
+class _SpotRow:
+    """
+    One row of the grid. Spots are created when they are indexed, since all of their state lives
+    in the grid, so even very big grids do not keep rows * cols Spot objects in memory.
+    """
+    __slots__ = ("grid", "row")
+
+    def __init__(self, grid: "Grid", row: int):
+        self.grid: "Grid" = grid
+        self.row: int = row
+
+    def __len__(self) -> int:
+        return self.grid.cols
+
+    def __getitem__(self, col: int) -> Spot:
+        if col < 0:
+            col += self.grid.cols
+        if not 0 <= col < self.grid.cols:
+            raise IndexError("grid column out of range")
+        return Spot(self.row, col, self.grid)
+
+    def __iter__(self):
+        for col in range(self.grid.cols):
+            yield Spot(self.row, col, self.grid)
+
+class _SpotRows:
+    """
+    The rows of the grid, so grid.grid[row][col] and "for row in grid.grid" work like on a 2D list.
+    """
+    __slots__ = ("grid",)
+
+    def __init__(self, grid: "Grid"):
+        self.grid: "Grid" = grid
+
+    def __len__(self) -> int:
+        return self.grid.rows
+
+    def __getitem__(self, row: int) -> _SpotRow:
+        if row < 0:
+            row += self.grid.rows
+        if not 0 <= row < self.grid.rows:
+            raise IndexError("grid row out of range")
+        return _SpotRow(self.grid, row)
+
+    def __iter__(self):
+        for row in range(self.grid.rows):
+            yield _SpotRow(self.grid, row)
+
 class Grid:
+    # grid lines closer than this (in pixels) are not drawn, they would only cover the spots
+    MIN_LINE_SPACING = 4
+
     def __init__(self, win: pygame.Surface, rows: int, cols: int, width: int, height: int):
         """
         Initialize a grid with the given number of rows and columns, of the width and height of the window.
@@ -18,52 +76,119 @@ class Grid:
         self.cols: int = cols
         self.width: int = width
         self.height: int = height
-        self.grid: list[list[Spot]] = self._make_grid()
+        self.camera: Camera = Camera(rows, cols, width, height)  # which part of the grid is shown
+        # the state code of every spot, one byte each. The row index grows along x, so the
+        # spot (row, col) is stored at col * rows + row and the array can be used directly
+        # as the pixels of a rows x cols image (see _make_cells_surface).
+        self.states: bytearray = bytearray(rows * cols)
+        self.grid: _SpotRows = _SpotRows(self)  # grid.grid[row][col] gives the Spot at (row, col)
+        # increased every time a spot becomes or stops being a barrier, so anything computed from
+        # the barriers (like the connected components) knows when it is out of date
+        self.barrier_version: int = 0
+        # component label of every spot, -1 for barriers. A new grid is a single empty component. Single spots
+        # update the labels as they change (see barrier_changed_at), labels merged since then are in _merged.
+        self._components: array = array("i", [0]) * (rows * cols)
+        self._merged: dict[int, int] = {}  # label -> label it was merged into
+        self._next_label: int = rows * cols  # labels from _label_components are below the number of spots
+        self._components_current: bool = True  # False until update_components() once they may be wrong
+        self._workspace: SearchWorkspace | None = None  # created by the first search
+        # surfaces used for drawing, created the first time the grid is drawn
+        self._cells_surface: pygame.Surface | None = None
+        self._lines_surface: pygame.Surface | None = None
+        self._lines_spacing: tuple[float, float] | None = None  # spot size the lines were drawn for
 
-    def _make_grid(self) -> list[list[Spot]]:
+    @property
+    def workspace(self) -> SearchWorkspace:
         """
-        Create a grid of Spot objects.
+        The search workspace of the grid, allocated the first time a search needs it.
         Returns:
-            list[list[Spot]]: A 2D list (matrix) representing the grid of Spot objects.
-        """
-        grid = []
-        spot_width = self.width // self.rows  # width of each spot
-        spot_height = self.height // self.cols  # height of each spot
-        for i in range(self.rows):
-            grid.append([])
-            for j in range(self.cols):
-                spot = Spot(i, j, spot_width, spot_height, self.rows)
-                grid[i].append(spot)
-        return grid
+            SearchWorkspace: Arrays with one entry per spot, reused by every search on this grid.
+        """
+        if self._workspace is None:
+            self._workspace = SearchWorkspace(self.rows, self.cols)
+        return self._workspace
 
-    def draw_grid_lines(self) -> None:
+    def spot_at(self, index: int) -> Spot:
         """
-        Draw the grid lines on the Pygame window.
+        Get the spot at an index of the state array (see Spot.index).
+        Args:
+            index (int): The index of the spot.
         Returns:
-            None
+            Spot: The spot at that index.
         """
-        spot_width = self.width // self.rows  # gap between lines
-        spot_height = self.height // self.cols  # gap between lines
-        for i in range(self.rows):
+        return Spot(index % self.rows, index // self.rows, self)
+
+    def _make_cells_surface(self) -> pygame.Surface:
+        """
+        Create an 8-bit surface with one pixel per spot that shares its memory with the state array,
+        so changing a state changes the pixel too. The palette turns each state code into its color.
+        Returns:
+            pygame.Surface: A rows x cols palette surface.
+        """
+        surface = pygame.image.frombuffer(self.states, (self.rows, self.cols), "P")
+        surface.set_palette(STATE_COLORS)
+        return surface
+
+    def _make_lines_surface(self) -> pygame.Surface:
+        """
+        Pre-render the grid lines for the current zoom on a transparent surface a bit bigger
+        than the window, so it can be reused while panning.
+        Returns:
+            pygame.Surface: The grid lines layer.
+        """
+        spot_width = self.camera.spot_width  # gap between lines
+        spot_height = self.camera.spot_height  # gap between lines
+        width = self.width + math.ceil(spot_width) + 1
+        height = self.height + math.ceil(spot_height) + 1
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        for j in range(math.ceil(height / spot_height)):
             # draw horizontal lines
-            pygame.draw.line(self.win, COLORS['GREY'], (0, i * spot_height), (self.width, i * spot_height))
-        for j in range(self.cols):
+            pygame.draw.line(surface, COLORS['GREY'], (0, round(j * spot_height)), (width, round(j * spot_height)))
+        for i in range(math.ceil(width / spot_width)):
             # draw vertical lines
-            pygame.draw.line(self.win, COLORS['GREY'], (j * spot_width, 0), (j * spot_width, self.height))
+            pygame.draw.line(surface, COLORS['GREY'], (round(i * spot_width), 0), (round(i * spot_width), height))
+        return surface
+
+    def draw_grid_lines(self) -> None:
+        """
+        Draw the grid lines of the visible spots on the Pygame window.
+        Returns:
+            None
+        """
+        spacing = (self.camera.spot_width, self.camera.spot_height)
+        if min(spacing) < self.MIN_LINE_SPACING:
+            return
+        if self._lines_spacing != spacing:
+            self._lines_surface = self._make_lines_surface()
+            self._lines_spacing = spacing
+        first_row, last_row, first_col, last_col = self.camera.visible_spots()
+        x, y = self.camera.to_screen(first_row, first_col)
+        end_x, end_y = self.camera.to_screen(last_row, last_col)
+        self.win.blit(self._lines_surface, (x, y), (0, 0, end_x - x, end_y - y))
 
     def draw(self, update_display=True) -> None:
         """
-        Draw the entire grid and its spots on the Pygame window.
+        Draw the visible part of the grid and its spots on the Pygame window.
+        The spots are drawn with a single blit of the visible part of the state array, scaled up to
+        the size of the spots, so the cost of a frame depends on the window and not on the grid size.
         Returns:
             None
         """
         self.win.fill(COLORS['PINK'])  # fill the window with pink color
 
-        for row in self.grid:
-            for spot in row:
-                spot.draw(self.win)   # draw each spot
+        if self._cells_surface is None:
+            self._cells_surface = self._make_cells_surface()
+        clip = self.win.get_clip()
+        self.win.set_clip((0, 0, self.width, self.height))  # spots on the border must not cover the buttons
+
+        first_row, last_row, first_col, last_col = self.camera.visible_spots()
+        x, y = self.camera.to_screen(first_row, first_col)
+        end_x, end_y = self.camera.to_screen(last_row, last_col)
+        visible = self._cells_surface.subsurface((first_row, first_col, last_row - first_row, last_col - first_col))
+        self.win.blit(pygame.transform.scale(visible, (end_x - x, end_y - y)), (x, y))  # draw the visible spots
 
         self.draw_grid_lines()        # draw the grid lines
+        self.win.set_clip(clip)
         if update_display:
             pygame.display.update()   # update the display if requested
 
@@ -75,19 +200,167 @@ class Grid:
         Returns:
             tuple[int, int]: The (row, col) position of the clicked spot in the grid.
         """
-        spot_width = self.width // self.cols
-        spot_height = self.height // self.rows
-        x, y = pos
-        col = x // spot_width
-        row = y // spot_height
-        return col, row
-    
+        return self.camera.to_grid(pos)  # the row index grows along x and the column index along y
+
     def reset(self) -> None:
         """
         Reset the grid to its initial state.
         Returns:
             None
         """
-        for row in self.grid:
-            for spot in row:
-                spot.reset()
\ No newline at end of file
+        # assign in place: the cells surface shares the memory of the state array
+        self.states[:] = bytes([EMPTY]) * len(self.states)
+        self.barriers_changed()
+        self._components[:] = array("i", [0]) * len(self.states)  # a single component again
+        self._merged.clear()
+        self._components_current = True
+
+    def barriers_changed(self) -> None:
+        """
+        Tell the grid that barriers were added or removed, for code that writes the state array directly
+        (Spot does it by itself). The components are out of date until update_components() is called.
+        Returns:
+            None
+        """
+        self.barrier_version += 1
+        self._components_current = False
+
+    def barrier_changed_at(self, index: int, barrier: bool) -> None:
+        """
+        Tell the grid that one spot becomes or stops being a barrier, before its state is written (called by Spot).
+        The component labels are updated in place: a freed spot joins the components of its free neighbors,
+        and a new barrier only makes them out of date when it could split its free neighbors apart.
+        Args:
+            index (int): The index of the spot.
+            barrier (bool): True if the spot becomes a barrier, False if it stops being one.
+        Returns:
+            None
+        """
+        self.barrier_version += 1
+        if not self._components_current:
+            return
+        labels = self._components
+        if barrier:
+            labels[index] = -1
+            if self._may_split(index):
+                self._components_current = False
+            return
+        rows, states = self.rows, self.states
+        row = index % rows
+        roots = {
+            self._find(labels[neighbor])
+            for neighbor, inside in ((index + 1, row < rows - 1), (index - 1, row > 0),
+                                     (index + rows, index + rows < len(states)), (index - rows, index >= rows))
+            if inside and states[neighbor] != BARRIER
+        }
+        if not roots:
+            labels[index] = self._next_label  # a component of its own
+            self._next_label += 1
+            return
+        root = roots.pop()
+        for other in roots:
+            self._merged[other] = root
+        labels[index] = root
+
+    def _may_split(self, index: int) -> bool:
+        """
+        Check if a spot that becomes a barrier could split its free neighbors apart. They cannot when they are
+        all connected through the 8 spots around it (the corners between them are free).
+        Args:
+            index (int): The index of the spot.
+        Returns:
+            bool: True if the free neighbors may end up in different components.
+        """
+        rows, cols, states = self.rows, self.cols, self.states
+        row, col = index % rows, index // rows
+        # the 8 spots around, in order: the neighbors are at the even positions, the corners between them at the odd ones
+        ring = [
+            0 <= row + d_row < rows and 0 <= col + d_col < cols and states[(col + d_col) * rows + row + d_row] != BARRIER
+            for d_row, d_col in ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+        ]
+        # count the groups of free neighbors, a neighbor starts one unless it is joined to the previous neighbor
+        groups = sum(1 for i in range(0, 8, 2) if ring[i] and not (ring[i - 1] and ring[i - 2]))
+        return groups > 1
+
+    def _find(self, label: int) -> int:
+        # the label a label was merged into, with path halving
+        merged = self._merged
+        while label in merged:
+            up = merged[label]
+            if up in merged:
+                merged[label] = merged[up]
+            label = up
+        return label
+
+    def _label_components(self) -> array:
+        """
+        Label the connected components of the spots that are not barriers.
+        Each col of the state array is split in runs of free spots, runs touching a run of the previous col
+        are merged with union-find, then every spot gets the label of its run. This costs one step per run
+        instead of one per spot.
+        Returns:
+            array: The component label of every spot (in the order of the state array), -1 for barriers.
+        """
+        rows = self.rows
+        parent = []  # union-find forest over the runs
+        runs = []  # (first index, end index) of every run in the state array
+
+        def find(run: int) -> int:
+            while parent[run] != run:
+                parent[run] = parent[parent[run]]
+                run = parent[run]
+            return run
+
+        previous = []  # (first row, end row, run id) of the runs of the previous col
+        for col in range(self.cols):
+            start = col * rows
+            current = []
+            i = 0  # position in the runs of the previous col, which are sorted like the current ones
+            for match in FREE_RUN.finditer(self.states, start, start + rows):
+                first, end = match.start() - start, match.end() - start
+                run = len(runs)
+                parent.append(run)
+                runs.append((match.start(), match.end()))
+                while i < len(previous) and previous[i][1] <= first:
+                    i += 1
+                j = i
+                while j < len(previous) and previous[j][0] < end:  # runs side by side are connected
+                    root, other = find(run), find(previous[j][2])
+                    if root != other:
+                        parent[other] = root
+                    j += 1
+                current.append((first, end, run))
+            previous = current
+
+        labels = array("i", [-1]) * len(self.states)
+        for run, (first, end) in enumerate(runs):
+            labels[first:end] = array("i", [find(run)]) * (end - first)
+        return labels
+
+    def update_components(self) -> None:
+        """
+        Label the components again if they may be out of date. This costs a pass over the whole grid, so the
+        visualizer does it right after a whole map was written, instead of in the first search after it.
+        Returns:
+            None
+        """
+        if not self._components_current:
+            self._components = self._label_components()
+            self._merged.clear()
+            self._next_label = len(self.states)
+            self._components_current = True
+
+    def is_reachable(self, start: Spot, end: Spot) -> bool:
+        """
+        Check if there is a path between two spots, in O(1) from the component labels.
+        Single spots keep the labels up to date, they are computed again (see update_components) only after
+        a whole map was written or a new barrier may have split a component, e.g. when a wall is closed.
+        Args:
+            start (Spot): The starting spot.
+            end (Spot): The ending spot.
+        Returns:
+            bool: True if end can be reached from start, False otherwise.
+        """
+        self.update_components()
+        label = self._components[start.index]
+        return label != -1 and self._find(label) == self._find(self._components[end.index])
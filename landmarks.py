@@ -0,0 +1,120 @@
+from array import array
+from collections import deque
+from grid import Grid
+from utils import BARRIER
+
+class LandmarkHeuristic:
+    """
+    ALT heuristic (A*, Landmarks, Triangle inequality).
+    A few landmark spots are picked and the BFS distance from each of them to every spot is stored.
+    For any landmark L, d(a, b) >= |d(L, a) - d(L, b)|, so the largest of these bounds (and the
+    Manhattan distance) never overestimates, and it is much closer to the real distance than the
+    Manhattan distance when barriers force long detours.
+    The tables are computed again the first time the heuristic is used after the barriers changed,
+    with the landmarks picked in the component of the target.
+    """
+
+    def __init__(self, grid: Grid, landmarks: int = 4):
+        """
+        Initialize the heuristic for a grid. The tables are computed when it is first used.
+        Args:
+            grid (Grid): The grid the heuristic is used on.
+            landmarks (int): Number of landmarks.
+        """
+        self.grid: Grid | None = grid
+        self.rows: int = grid.rows
+        self.landmarks: int = landmarks
+        self.spots: list[int] = []  # index of every landmark in the state array
+        self.tables: list[array] = []  # BFS distance from every landmark, -1 if unreachable
+        self._version: int = -1  # barrier version of the grid the tables were computed for
+
+    def __getstate__(self) -> dict:
+        """
+        Pickle the heuristic without its grid (and the surfaces of the grid), e.g. to send it to worker processes.
+        The copy keeps using the tables it was sent with.
+        """
+        state = self.__dict__.copy()
+        state["grid"] = None
+        return state
+
+    def _distances(self, source: int) -> array:
+        """
+        Breadth-first search from one spot over the free spots of the grid.
+        Args:
+            source (int): Index of the spot in the state array.
+        Returns:
+            array: The distance from source to every spot, -1 if it cannot be reached.
+        """
+        states, rows, cols = self.grid.states, self.grid.rows, self.grid.cols
+        last = rows * cols - rows  # first index of the last col
+        distances = array("i", [-1]) * len(states)
+        distances[source] = 0
+        queue = deque([source])
+        while queue:
+            index = queue.popleft()
+            distance = distances[index] + 1
+            row = index % rows
+            if row < rows - 1 and distances[index + 1] < 0 and states[index + 1] != BARRIER:
+                distances[index + 1] = distance
+                queue.append(index + 1)
+            if row > 0 and distances[index - 1] < 0 and states[index - 1] != BARRIER:
+                distances[index - 1] = distance
+                queue.append(index - 1)
+            if index < last and distances[index + rows] < 0 and states[index + rows] != BARRIER:
+                distances[index + rows] = distance
+                queue.append(index + rows)
+            if index >= rows and distances[index - rows] < 0 and states[index - rows] != BARRIER:
+                distances[index - rows] = distance
+                queue.append(index - rows)
+        return distances
+
+    def refresh(self, seed: int | None = None) -> None:
+        """
+        Pick the landmarks and compute their distance tables for the current barriers.
+        Landmarks are picked by farthest-point selection in the component of the seed spot: the first one
+        is the spot farthest from the seed, every next one is the spot farthest from all the landmarks
+        picked so far.
+        Args:
+            seed (int | None): Index of a free spot in the state array, by default the first free spot.
+        Returns:
+            None
+        """
+        self.spots = []
+        self.tables = []
+        self._version = self.grid.barrier_version
+        if seed is None:
+            seed = next((i for i, state in enumerate(self.grid.states) if state != BARRIER), None)
+            if seed is None:
+                return
+        # distance to the closest landmark picked so far, starting from the seed
+        closest = self._distances(seed)
+        for _ in range(self.landmarks):
+            farthest = max(range(len(closest)), key=closest.__getitem__)
+            if closest[farthest] <= 0:
+                break  # every reachable spot is already a landmark
+            table = self._distances(farthest)
+            self.spots.append(farthest)
+            self.tables.append(table)
+            closest = array("i", map(min, closest, table))
+
+    def __call__(self, p1: tuple[int, int], p2: tuple[int, int]) -> float:
+        """
+        Heuristic function for A* algorithm: uses the landmark (triangle inequality) bound between two points.
+        Args:
+            p1 (tuple[int, int]): The first point (row, col).
+            p2 (tuple[int, int]): The second point (row, col).
+        Returns:
+            float: A lower bound of the length of the shortest path between p1 and p2.
+        """
+        rows = self.rows
+        a = p1[1] * rows + p1[0]
+        b = p2[1] * rows + p2[0]
+        if self.grid is not None and (self._version != self.grid.barrier_version or (self.tables and self.tables[0][b] < 0)):
+            # the barriers changed, or the target is in a component without landmarks
+            self.refresh(b)
+        best = abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])  # the Manhattan distance is a lower bound too
+        for table in self.tables:
+            distance_a, distance_b = table[a], table[b]
+            if distance_a >= 0 and distance_b >= 0 and abs(distance_a - distance_b) > best:
+                best = abs(distance_a - distance_b)
+        return best
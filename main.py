@@ -1,7 +1,13 @@
 import pygame
+from functools import lru_cache
 from utils import WIDTH, HEIGHT, COLORS
+from compare import Comparison
 from grid import Grid
+from landmarks import LandmarkHeuristic
+from map_generators import GENERATORS
 from searching_algorithms import bfs, dfs, astar, dls, greedy, h_euclidian_distance, h_manhattan_distance, ida, iddfs, ucs
+from parallel_search import ida_parallel, iddfs_parallel
+from bounded_search import MemoryBoundedAStar
 
 pygame.init()
 
@@ -12,6 +18,22 @@ if __name__ == "__main__":
     pygame.display.set_caption("Pretty Pink Pathfinding Algorithm Visualizer")
 
     BUTTON_HEIGHT = 40
+    sma_star = MemoryBoundedAStar()  # keeps whether its last path is the shortest, see search_report
+
+    def frame_limited(draw):
+        # SMA* generates the same spots again and again, drawing after every one of them would take minutes:
+        # redraw at most MAX_FPS times per second instead, and keep answering the system meanwhile
+        last_frame = -1000
+
+        def limited_draw():
+            nonlocal last_frame
+            now = pygame.time.get_ticks()
+            if now - last_frame >= 1000 // MAX_FPS:
+                last_frame = now
+                pygame.event.pump()
+                draw()
+        return limited_draw
+
     BUTTONS = [
         ("BFS", bfs),
         ("DFS", dfs),
@@ -21,8 +43,13 @@ if __name__ == "__main__":
         ("Greedy", greedy),
         ("IDDFS", lambda d, g, s, e: iddfs(d, g, s, e, get_depth_limit())),
         ("IDA*", ida),
+        ("P-IDDFS", lambda d, g, s, e: iddfs_parallel(d, g, s, e, get_depth_limit())),  # split over worker processes
+        ("P-IDA*", ida_parallel),
+        ("SMA*", lambda d, g, s, e, heuristic: sma_star(frame_limited(d), g, s, e, heuristic=heuristic, budget=get_depth_limit() or None)),
     ]
-    button_rects = []
+    # the buttons never move, so their rects are computed once
+    BUTTON_SPACING = (WIDTH - 10) // len(BUTTONS)
+    button_rects = [(pygame.Rect(10 + i * BUTTON_SPACING, HEIGHT + 10, BUTTON_SPACING - 10, BUTTON_HEIGHT), name) for i, (name, _) in enumerate(BUTTONS)]
 
     HEURISTICS = {
         "Manhattan": h_manhattan_distance,
@@ -34,25 +61,37 @@ if __name__ == "__main__":
     ROWS = 50  # number of rows
     COLS = 50  # number of columns
     grid = Grid(WIN, ROWS, COLS, WIDTH, HEIGHT)
+    HEURISTICS["ALT"] = LandmarkHeuristic(grid)  # landmark distances, refreshed when barriers change
+
+    generated_maps = 0  # G generates the next kind of map from GENERATORS, seeded with this count
+
+    ZOOM_STEP = 1.25  # zoom factor of one mouse wheel step
+    PAN_KEYS = {  # arrow keys move the view by a quarter of the window
+        pygame.K_LEFT: (-1, 0),
+        pygame.K_RIGHT: (1, 0),
+        pygame.K_UP: (0, -1),
+        pygame.K_DOWN: (0, 1),
+    }
 
     font = pygame.font.SysFont(None, 24) # sadly keep default for portable code
+    MAX_FPS = 60  # the window is redrawn at most this often, and only after something changed
+
+    @lru_cache(maxsize=256)
+    def render_text(text, color):
+        # rendering text is slow, every label is rendered once and its surface reused by every frame
+        return font.render(text, True, color)
 
     def draw_buttons(selected_name):
-        y = HEIGHT + 10
-        x = 10
-        for name, _ in BUTTONS:
-            rect = pygame.Rect(x, y, 90, BUTTON_HEIGHT)
-            button_rects.append((rect, name))
+        for rect, name in button_rects:
             if name == selected_name:
                 color = COLORS['ORANGE']
             else:
                 color = COLORS['DARK PINK']
             pygame.draw.rect(WIN, color, rect)
             pygame.draw.rect(WIN, COLORS['WHITE'], rect, 2)
-            text = font.render(name, True, COLORS['WHITE'])
+            text = render_text(name, COLORS['WHITE'])
             text_rect = text.get_rect(center=rect.center)
             WIN.blit(text, text_rect)
-            x += 100
 
     input_box_active = False
     input_text = ""
@@ -60,13 +99,19 @@ if __name__ == "__main__":
     def draw_input_depth_limit():
         global input_box_rect
         BAR_HEIGHT = 60
-        pygame.draw.rect(WIN, COLORS['DARK PINK'], (0, 0, WIDTH, BAR_HEIGHT))
         padding_y = 10
 
-        label_text = "Depth Limit:"
-        label_surface = font.render(label_text, True, COLORS['WHITE'])
+        if selected_algorithm_name == "SMA*":
+            # the bar is drawn with the heuristic dropdown on its right, the budget goes on the left
+            label_text = "Node Budget:"
+            label_x = 20
+        else:
+            pygame.draw.rect(WIN, COLORS['DARK PINK'], (0, 0, WIDTH, BAR_HEIGHT))
+            label_text = "Depth Limit:"
+            label_x = WIDTH - 250
+        label_surface = render_text(label_text, COLORS['WHITE'])
         label_rect = label_surface.get_rect()
-        label_rect.topleft = (WIDTH - 250, (BAR_HEIGHT - label_rect.height) // 2)
+        label_rect.topleft = (label_x, (BAR_HEIGHT - label_rect.height) // 2)
 
         input_width = 80
         input_height = label_rect.height + padding_y * 2
@@ -78,7 +123,7 @@ if __name__ == "__main__":
         pygame.draw.rect(WIN, COLORS['PINK'], input_box_rect)
         pygame.draw.rect(WIN, border_color, input_box_rect, 2)
 
-        text_surface = font.render(input_text or "Type...", True, COLORS['WHITE'])
+        text_surface = render_text(input_text or "Type...", COLORS['WHITE'])
         WIN.blit(label_surface, label_rect.topleft)
         WIN.blit(text_surface, (input_box_rect.x + 5, input_box_rect.y + 5))
 
@@ -96,7 +141,7 @@ if __name__ == "__main__":
         padding_y = 10
 
         text = f"Heuristic: {selected_heuristic_name}"
-        text_surface = font.render(text, True, COLORS['WHITE'])
+        text_surface = render_text(text, COLORS['WHITE'])
         text_width, text_height = font.size(text)
 
         rect_width = text_width + padding_x * 2
@@ -113,7 +158,7 @@ if __name__ == "__main__":
 
         if heuristic_dropdown_open:
             for i, name in enumerate(HEURISTICS.keys()):
-                option = font.render(name, True, COLORS['WHITE'])
+                option = render_text(name, COLORS['WHITE'])
                 option_width, option_height = font.size(name)
                 option_rect = pygame.Rect(x, BAR_HEIGHT + i * rect_height, max(rect_width, option_width + padding_x * 2), rect_height)
                 pygame.draw.rect(WIN, COLORS['DARK PINK'], option_rect)
@@ -153,14 +198,44 @@ if __name__ == "__main__":
                     return True # user clicked on dropdown option, not grid
         return False
 
+    comparison = None  # the runs of the compare mode while it is shown (press K)
+    COMPARE_COLUMNS = [("Algorithm", 10), ("Time", 210), ("Expanded", 300), ("Frontier peak", 390), ("Path", 520)]
+    THUMBNAIL_SIZE = 110  # final exploration of every run, 4 per line right of the table
+    def draw_comparison():
+        pygame.draw.rect(WIN, COLORS['PINK'], (0, 0, WIDTH, HEIGHT))
+        for name, x in COMPARE_COLUMNS:
+            WIN.blit(render_text(name, COLORS['DARK PINK']), (x, 10))
+        scale = THUMBNAIL_SIZE / max(comparison.rows, comparison.cols)
+        size = (round(comparison.rows * scale), round(comparison.cols * scale))
+        for i, result in enumerate(comparison.results):
+            if result is not None:
+                cells = [f"{result.time * 1000:.1f} ms", str(result.expanded), str(result.frontier_peak), str(result.path_length) if result.found else "none"]
+            else:
+                cells = [comparison.errors[i] or "running...", "", "", ""]
+            for (_, x), text in zip(COMPARE_COLUMNS, [f"{i + 1}. {comparison.label(i)}"] + cells):
+                WIN.blit(render_text(text, COLORS['PURPLE']), (x, 40 + i * 26))
+
+            x = 580 + (i % 4) * (THUMBNAIL_SIZE + 10)
+            y = 10 + (i // 4) * (THUMBNAIL_SIZE + 26)
+            WIN.blit(render_text(str(i + 1), COLORS['PURPLE']), (x, y))
+            if result is not None:
+                WIN.blit(result.thumbnail(comparison.rows, comparison.cols, size), (x, y + 20))
+            pygame.draw.rect(WIN, COLORS['WHITE'], (x, y + 20, *size), 1)
+        text = render_text("Press K or ESC to close", COLORS['PURPLE'])
+        WIN.blit(text, text.get_rect(center=(WIDTH // 2, HEIGHT - 40)))
+
     def draw_instructions():
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 0))
-        text = font.render("Press SPACE to run | Press C to clear the grid", True, COLORS['PURPLE'])
+        text = render_text("SPACE: run | C: clear | G: generate a map | K: compare all | Scroll to zoom, arrows to move", COLORS['PURPLE'])
         text_rect = text.get_rect(center=(WIDTH // 2, HEIGHT - 40))
-        pygame.draw.rect(overlay, COLORS['WHITE'], text_rect.inflate(20, 10))
-        overlay.blit(text, text_rect)
-        WIN.blit(overlay, (0, 0))
+        pygame.draw.rect(WIN, COLORS['WHITE'], text_rect.inflate(20, 10))
+        WIN.blit(text, text_rect)
+
+    search_report = None  # what the last search has to say about its path, if anything
+    def draw_search_report():
+        text = render_text(search_report, COLORS['PURPLE'])
+        text_rect = text.get_rect(center=(WIDTH // 2, HEIGHT - 75))
+        pygame.draw.rect(WIN, COLORS['WHITE'], text_rect.inflate(20, 10))
+        WIN.blit(text, text_rect)
 
     start = None
     end = None
@@ -170,30 +245,58 @@ if __name__ == "__main__":
     # flags for running the main loop
     run = True
     started = False
+    redraw = True  # something changed since the last frame
+    clock = pygame.time.Clock()
 
     while run:
-        grid.draw(update_display=False)  # draw grid without updating display
-        button_rects.clear()
-        draw_instructions()
-        draw_buttons(selected_algorithm_name)
-        if selected_algorithm_name in ["A*", "Greedy", "IDA*"]:
-            draw_heuristic_dropdown()
-        if selected_algorithm_name in ["DLS", "IDDFS"]:
-            draw_input_depth_limit()
-        pygame.display.update()   
-
-        for event in pygame.event.get():
+        if redraw:
+            grid.draw(update_display=False)  # draw grid without updating display
+            draw_instructions()
+            if search_report:
+                draw_search_report()
+            draw_buttons(selected_algorithm_name)
+            if selected_algorithm_name in ["A*", "Greedy", "IDA*", "P-IDA*", "SMA*"]:
+                draw_heuristic_dropdown()
+            if selected_algorithm_name in ["DLS", "IDDFS", "P-IDDFS", "SMA*"]:
+                draw_input_depth_limit()
+            if comparison is not None:
+                draw_comparison()
+            pygame.display.update()
+            redraw = False
+            clock.tick(MAX_FPS)  # e.g. while dragging, do not redraw faster than MAX_FPS
+
+        # sleep until something happens, then handle everything that happened
+        for event in [pygame.event.wait()] + pygame.event.get():
             # verify what events happened
             if event.type == pygame.QUIT:
                 run = False
 
+            if event.type != pygame.MOUSEMOTION or any(event.buttons):
+                redraw = True  # only moving the mouse does not change anything on screen
+
             if started:
                 # do not allow any other interaction if the algorithm has started
                 continue  # ignore other events if algorithm started
 
+            if comparison is not None:
+                # the compare mode covers the grid, only closing it does something
+                if event.type == pygame.KEYDOWN and event.key in (pygame.K_k, pygame.K_ESCAPE):
+                    comparison.stop()  # kill the runs still going
+                    comparison = None
+                continue
+
+            if event.type == pygame.MOUSEWHEEL:  # zoom around the mouse
+                pos = pygame.mouse.get_pos()
+                if pos[1] < HEIGHT:
+                    grid.camera.zoom_at(ZOOM_STEP ** event.y, pos)
+                continue
+            if event.type == pygame.MOUSEMOTION and event.buttons[1]:  # drag with the middle button to move
+                grid.camera.pan(-event.rel[0], -event.rel[1])
+                continue
+
             if pygame.mouse.get_pressed()[0]:  # LEFT CLICK
                 pos = pygame.mouse.get_pos()
-                if selected_algorithm_name in ["DLS", "IDDFS"]:
+                if selected_algorithm_name in ["DLS", "IDDFS", "P-IDDFS", "SMA*"]:
                     if input_box_rect.collidepoint(event.pos):
                         input_box_active = True
                     else:
@@ -249,20 +352,48 @@ if __name__ == "__main__":
 
                 if event.key == pygame.K_SPACE and not started:
                     if start and end and selected_algorithm_func:
-                        for row in grid.grid:
-                            for spot in row:
-                                spot.update_neighbors(grid.grid)
                         started = True
+                        search_report = None
 
-                        if selected_algorithm_name in ["A*", "Greedy", "IDA*"]:
-                            selected_algorithm_func(lambda: grid.draw(), grid, start, end, heuristic=HEURISTICS[selected_heuristic_name])
+                        if selected_algorithm_name in ["A*", "Greedy", "IDA*", "P-IDA*", "SMA*"]:
+                            found = selected_algorithm_func(lambda: grid.draw(), grid, start, end, heuristic=HEURISTICS[selected_heuristic_name])
                         else:
-                            selected_algorithm_func(lambda: grid.draw(), grid, start, end)
+                            found = selected_algorithm_func(lambda: grid.draw(), grid, start, end)
                         started = False
 
+                        if selected_algorithm_name == "SMA*":
+                            if sma_star.gave_up:
+                                search_report = f"Gave up, the budget is too small for this map ({sma_star.dropped} spots forgotten)"
+                            elif not found:
+                                search_report = f"No path found within the budget ({sma_star.dropped} spots forgotten)"
+                            elif sma_star.optimal:
+                                search_report = f"Shortest path guaranteed ({sma_star.dropped} spots forgotten)"
+                            else:
+                                search_report = f"Path not guaranteed to be the shortest, the budget is too small ({sma_star.dropped} spots forgotten)"
+
+                if event.key == pygame.K_k and start and end:
+                    # run every search on a snapshot of the grid in the background, see compare.py
+                    comparison = Comparison(grid, start, end, get_depth_limit())
+
+                if event.key in PAN_KEYS:
+                    dx, dy = PAN_KEYS[event.key]
+                    grid.camera.pan(dx * WIDTH // 4, dy * HEIGHT // 4)
+
+                if event.key == pygame.K_g:
+                    generator = list(GENERATORS.values())[generated_maps % len(GENERATORS)]
+                    generator(grid, seed=generated_maps)  # clears the grid, start and end included
+                    grid.update_components()  # once per map, single spots keep them up to date afterwards
+                    generated_maps += 1
+                    search_report = None
+                    start = None
+                    end = None
+
                 if event.key == pygame.K_c:
                     start = None
                     end = None
                     grid.reset()
+                    search_report = None
                     selected_algorithm_name = None
+    if comparison is not None:
+        comparison.stop()
     pygame.quit()
@@ -0,0 +1,194 @@
+import random
+import pygame
+from grid import Grid
+from utils import EMPTY, BARRIER
+
+# All generators write the whole state array of the grid at once, so they also clear it (start, end,
+# path...), and then call grid.barriers_changed(). Spot (row, col) is at col * rows + row: a fixed col is a contiguous slice of the array
+# and a fixed row is a slice with a step of rows, which lets whole walls be written in one assignment.
+
+def random_obstacles(grid: Grid, density: float = 0.3, seed: int | None = None) -> None:
+    """
+    Fill the grid with barriers placed at random.
+    Args:
+        grid (Grid): The grid to fill.
+        density (float): The probability of each spot to be a barrier.
+        seed (int | None): Seed of the random generator, the same seed gives the same map.
+    Returns:
+        None
+    """
+    rng = random.Random(seed)
+    threshold = round(density * 256)
+    # one random byte per spot, turned into a state code by a 256-entry lookup table
+    table = bytes(BARRIER if value < threshold else EMPTY for value in range(256))
+    grid.states[:] = rng.randbytes(len(grid.states)).translate(table)
+    grid.barriers_changed()
+
+def recursive_division(grid: Grid, seed: int | None = None) -> None:
+    """
+    Fill the grid with a maze built by recursive division: every chamber is split by a wall with a
+    single door, then both halves are split again. Walls are on odd rows/cols and doors on even ones,
+    so every free spot stays reachable.
+    Args:
+        grid (Grid): The grid to fill.
+        seed (int | None): Seed of the random generator, the same seed gives the same map.
+    Returns:
+        None
+    """
+    rng = random.Random(seed)
+    states, rows = grid.states, grid.rows
+    states[:] = bytes(len(states))
+    wall = bytes([BARRIER]) * max(grid.rows, grid.cols)
+
+    # chambers are (first row, last row, first col, last col) with even bounds. A chamber one spot
+    # thick is never split, its walls would be a single spot with the door on it.
+    # random() is used instead of randrange() since this loop runs once for every wall of the maze.
+    chambers = [(0, (grid.rows - 1) & ~1, 0, (grid.cols - 1) & ~1)]
+    random_ = rng.random
+    while chambers:
+        first_row, last_row, first_col, last_col = chambers.pop()
+        height = last_row - first_row
+        width = last_col - first_col
+        if height == 0 or width == 0:
+            continue
+        if height > width or (height == width and random_() < 0.5):
+            # wall along a row (a strided slice), with a door on an even col
+            wall_row = first_row + 2 * int(random_() * (height // 2)) + 1
+            door_col = first_col + 2 * int(random_() * (width // 2 + 1))
+            states[first_col * rows + wall_row:(last_col + 1) * rows:rows] = wall[:width + 1]
+            states[door_col * rows + wall_row] = EMPTY
+            chambers.append((first_row, wall_row - 1, first_col, last_col))
+            chambers.append((wall_row + 1, last_row, first_col, last_col))
+        else:
+            # wall along a col (a contiguous slice), with a door on an even row
+            wall_col = first_col + 2 * int(random_() * (width // 2)) + 1
+            door_row = first_row + 2 * int(random_() * (height // 2 + 1))
+            start = wall_col * rows
+            states[start + first_row:start + last_row + 1] = wall[:height + 1]
+            states[start + door_row] = EMPTY
+            chambers.append((first_row, last_row, first_col, wall_col - 1))
+            chambers.append((first_row, last_row, wall_col + 1, last_col))
+    grid.barriers_changed()
+
+def rooms_and_corridors(grid: Grid, rooms: int | None = None, seed: int | None = None) -> None:
+    """
+    Fill the grid with barriers and carve rectangular rooms in it, each one joined to the closest room
+    carved before it by an L-shaped corridor, so all the rooms are connected by short corridors.
+    Args:
+        grid (Grid): The grid to fill.
+        rooms (int | None): Number of rooms, by default enough for the rooms to cover about a third of the map.
+        seed (int | None): Seed of the random generator, the same seed gives the same map.
+    Returns:
+        None
+    """
+    rng = random.Random(seed)
+    states, rows, cols = grid.states, grid.rows, grid.cols
+    states[:] = bytes([BARRIER]) * len(states)
+    empty = bytes(max(rows, cols))
+    max_size = min(max(3, min(rows, cols) // 4), 15)  # rooms are 3 to 15 spots wide
+    if rooms is None:
+        mean_area = ((3 + max_size) / 2) ** 2
+        rooms = max(1, int(rows * cols / (3 * mean_area)))
+
+    # centers of the rooms carved so far, by bucket of bucket x bucket spots, to find the closest one
+    bucket = 4 * max_size
+    buckets = {}
+    for _ in range(rooms):
+        height = min(rng.randint(3, max_size), rows)
+        width = min(rng.randint(3, max_size), cols)
+        first_row = rng.randrange(rows - height + 1)
+        first_col = rng.randrange(cols - width + 1)
+        for col in range(first_col, first_col + width):
+            start = col * rows
+            states[start + first_row:start + first_row + height] = empty[:height]
+
+        center = (first_row + height // 2, first_col + width // 2)
+        closest = _closest_center(buckets, bucket, center)
+        if closest is not None:
+            (row_a, col_a), (row_b, col_b) = closest, center
+            # along the rows at col_a, then along the cols at row_b
+            low, high = min(row_a, row_b), max(row_a, row_b)
+            states[col_a * rows + low:col_a * rows + high + 1] = empty[:high - low + 1]
+            low, high = min(col_a, col_b), max(col_a, col_b)
+            states[low * rows + row_b:high * rows + row_b + 1:rows] = empty[:high - low + 1]
+        buckets.setdefault((center[0] // bucket, center[1] // bucket), []).append(center)
+    grid.barriers_changed()
+
+def _closest_center(buckets: dict, bucket: int, center: tuple[int, int]) -> tuple[int, int] | None:
+    """
+    Find the closest room center (Manhattan distance), looking at the buckets in rings around the one of center.
+    Args:
+        buckets (dict): The centers, by (row // bucket, col // bucket).
+        bucket (int): The size of a bucket in spots.
+        center (tuple[int, int]): The (row, col) to find the closest center to.
+    Returns:
+        tuple[int, int] | None: The closest center, None if there is none.
+    """
+    if not buckets:
+        return None
+    bucket_row, bucket_col = center[0] // bucket, center[1] // bucket
+    best, best_distance = None, None
+    ring = 0
+    while True:
+        for i in range(bucket_row - ring, bucket_row + ring + 1):
+            for j in range(bucket_col - ring, bucket_col + ring + 1):
+                if max(abs(i - bucket_row), abs(j - bucket_col)) != ring:
+                    continue  # inner rings are done already
+                for other in buckets.get((i, j), ()):
+                    distance = abs(other[0] - center[0]) + abs(other[1] - center[1])
+                    if best is None or distance < best_distance:
+                        best, best_distance = other, distance
+        # any center beyond this ring is more than ring * bucket spots away along rows or cols
+        if best is not None and best_distance <= ring * bucket:
+            return best
+        ring += 1
+
+def caves(grid: Grid, fill: float = 0.45, scale: int = 32, octaves: int = 4, seed: int | None = None) -> None:
+    """
+    Fill the grid with a cave-like map made from Perlin-style fractal noise: a few layers of random
+    values, each one smoothly interpolated over the grid at half the scale of the previous one
+    and with half its weight. Spots where the noise is low become barriers.
+    Args:
+        grid (Grid): The grid to fill.
+        fill (float): The fraction of the spots that become barriers.
+        scale (int): The size in spots of the biggest features.
+        octaves (int): Number of layers of noise.
+        seed (int | None): Seed of the random generator, the same seed gives the same map.
+    Returns:
+        None
+    """
+    rng = random.Random(seed)
+    rows, cols = grid.rows, grid.cols
+    gray = [(value, value, value) for value in range(256)]
+    weights = [2 ** (octaves - octave - 1) for octave in range(octaves)]
+    noise = pygame.Surface((rows, cols), 0, 24)
+    for octave, weight in enumerate(weights):
+        # random values on a coarse lattice, interpolated bilinearly by smoothscale
+        spacing = max(scale / 2 ** octave, 1)
+        size = (int(rows / spacing) + 2, int(cols / spacing) + 2)
+        lattice = pygame.image.frombuffer(rng.randbytes(size[0] * size[1]), size, "P")
+        lattice.set_palette(gray)
+        rgb = pygame.Surface(size, 0, 24)  # smoothscale needs 24 or 32 bits, convert() needs a display
+        rgb.blit(lattice, (0, 0))
+        layer = pygame.transform.smoothscale(rgb, (rows, cols))
+        # scale the layer by its weight, then add it to the noise
+        amount = 255 * weight // sum(weights)
+        layer.fill((amount, amount, amount), special_flags=pygame.BLEND_RGB_MULT)
+        noise.blit(layer, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+
+    # the red channel of the noise, in the same order as the state array
+    values = pygame.image.tobytes(noise, "RGB")[::3]
+    # pick the threshold giving the wanted fill from a sample of the values
+    sample = sorted(values[::max(1, len(values) // 10000)])
+    threshold = sample[min(int(fill * len(sample)), len(sample) - 1)]
+    table = bytes(BARRIER if value < threshold else EMPTY for value in range(256))
+    grid.states[:] = values.translate(table)
+    grid.barriers_changed()
+
+# the generators by name, used by the "G" key of the visualizer
+GENERATORS = {
+    "Random": random_obstacles,
+    "Maze": recursive_division,
+    "Rooms": rooms_and_corridors,
+    "Caves": caves,
+}
@@ -0,0 +1,266 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from grid import Grid
+from spot import Spot
+from searching_algorithms import h_manhattan_distance
+from utils import BARRIER
+
+# Parallel versions of IDA* and IDDFS. Every iteration (threshold or depth limit) is split at the root:
+# the paths from the start are expanded a few steps in this process, then the subtree under each of these
+# paths is searched by a worker process. Workers search the subtrees without drawing, on a copy of the
+# state array sent once when the pool starts. The first worker to find the end sets a shared event
+# that makes the others stop.
+
+CANCEL_CHECK = 1024  # workers check the cancel event every CANCEL_CHECK expansions
+
+# ---- Worker side ----
+# set in every worker process by _init_worker
+_states = b""
+_rows = 0
+_end = 0
+_heuristic = None
+_cancel = None
+
+def _init_worker(states: bytes, rows: int, end: int, heuristic: callable, cancel) -> None:
+    global _states, _rows, _end, _heuristic, _cancel
+    _states, _rows, _end, _heuristic, _cancel = states, rows, end, heuristic, cancel
+
+def _neighbors(index: int, states: bytes, rows: int) -> list[int]:
+    """
+    The free neighbors of a spot, in the same order as Spot.neighbors (down, up, right, left).
+    Args:
+        index (int): The index of the spot in the state array.
+        states (bytes): The state array.
+        rows (int): Number of rows in the grid.
+    Returns:
+        list[int]: The indices of the neighbors that are not barriers.
+    """
+    neighbors = []
+    row = index % rows
+    if row < rows - 1 and states[index + 1] != BARRIER:
+        neighbors.append(index + 1)
+    if row > 0 and states[index - 1] != BARRIER:
+        neighbors.append(index - 1)
+    if index + rows < len(states) and states[index + rows] != BARRIER:
+        neighbors.append(index + rows)
+    if index >= rows and states[index - rows] != BARRIER:
+        neighbors.append(index - rows)
+    return neighbors
+
+def _h(index: int, end: int, rows: int, heuristic: callable) -> float:
+    return heuristic((index % rows, index // rows), (end % rows, end // rows))
+
+def _ida_subtree(prefix: list[int], threshold: float) -> tuple[list[int] | None, float]:
+    """
+    Depth-first search of the subtree under a path from the start, cutting off at the threshold like IDA*.
+    Iterative, so deep paths do not hit the recursion limit.
+    Args:
+        prefix (list[int]): The path from the start to the root of the subtree.
+        threshold (float): The f threshold of the current iteration.
+    Returns:
+        tuple[list[int] | None, float]: The path to the end if found, and the smallest f over the threshold.
+    """
+    states, rows, end, heuristic = _states, _rows, _end, _heuristic
+    path = list(prefix)
+    on_path = set(prefix)
+    minimum = math.inf
+    stack = [iter(_neighbors(path[-1], states, rows))]
+    expanded = 0
+    while stack:
+        neighbor = next(stack[-1], None)
+        if neighbor is None:
+            stack.pop()
+            if stack:
+                on_path.discard(path.pop())
+            continue
+        if neighbor in on_path:
+            continue # no cycles allowed
+        f = len(path) + _h(neighbor, end, rows, heuristic)
+        if f > threshold:
+            minimum = min(minimum, f)
+            continue
+        if neighbor == end:
+            return path + [neighbor], threshold
+        path.append(neighbor)
+        on_path.add(neighbor)
+        stack.append(iter(_neighbors(neighbor, states, rows)))
+        expanded += 1
+        if expanded % CANCEL_CHECK == 0 and _cancel.is_set():
+            break # another worker found the end
+    return None, minimum
+
+def _dls_subtree(prefix: list[int], limit: int) -> list[int] | None:
+    """
+    Depth-limited search of the subtree under a path from the start, like dls() (a spot is visited once).
+    Args:
+        prefix (list[int]): The path from the start to the root of the subtree.
+        limit (int): The depth limit of the current iteration, counted from the start.
+    Returns:
+        list[int] | None: The path to the end if found, None otherwise.
+    """
+    states, rows, end = _states, _rows, _end
+    path = list(prefix)
+    visited = set(prefix)
+    stack = [iter(_neighbors(path[-1], states, rows))] if len(path) - 1 < limit else []
+    expanded = 0
+    while stack:
+        neighbor = next(stack[-1], None)
+        if neighbor is None:
+            stack.pop()
+            if stack:
+                path.pop()
+            continue
+        if neighbor in visited:
+            continue
+        visited.add(neighbor)
+        if neighbor == end:
+            return path + [neighbor]
+        if len(path) < limit: # the neighbor is at depth len(path)
+            path.append(neighbor)
+            stack.append(iter(_neighbors(neighbor, states, rows)))
+        expanded += 1
+        if expanded % CANCEL_CHECK == 0 and _cancel.is_set():
+            break # another worker found the end
+    return None
+
+# ---- Main process side ----
+def _run_iteration(pool: ProcessPoolExecutor, cancel, task: callable, prefixes: list[list[int]], bound) -> list:
+    """
+    Search the subtrees under the given paths in the pool, stopping everything when one finds the end.
+    Args:
+        pool (ProcessPoolExecutor): The worker processes.
+        cancel: The event shared with the workers.
+        task (callable): _ida_subtree or _dls_subtree.
+        prefixes (list[list[int]]): The paths to the roots of the subtrees.
+        bound: The threshold or depth limit of the iteration.
+    Returns:
+        list: The results of the finished tasks, the last one being the success if there was one.
+    """
+    cancel.clear()
+    pending = {pool.submit(task, prefix, bound) for prefix in prefixes}
+    results = []
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            result = future.result()
+            results.append(result)
+            found = result[0] if isinstance(result, tuple) else result
+            if found is not None:
+                cancel.set()
+                for other in pending:
+                    other.cancel()
+                wait(pending)
+                return results
+    return results
+
+def _mark_path(draw: callable, grid: Grid, path: list[int], start: Spot, end: Spot) -> None:
+    for index in path[1:-1]:
+        grid.spot_at(index).make_path()
+        draw()
+    end.make_end()
+    start.make_start()
+
+def _split_width(workers: int) -> int:
+    return workers * 4  # a few subtrees per worker, so they stay busy when subtrees are uneven
+
+def ida_parallel(draw: callable, grid: Grid, start: Spot, end: Spot, heuristic=h_manhattan_distance, workers: int | None = None) -> bool:
+    """
+    Iterative Deepening A* (IDA*) Algorithm, with every iteration split over worker processes.
+    Args:
+        draw (callable): Function to update the display.
+        grid (Grid): The Grid object.
+        start (Spot): Start node.
+        end (Spot): End node.
+        heuristic (callable): The heuristic, it must be picklable to be sent to the workers.
+        workers (int | None): Number of worker processes, by default the number of CPUs.
+    Returns:
+        bool: True if path found, else False.
+    """
+    if start is None or end is None or not grid.is_reachable(start, end):
+        return False # no threshold can reach a walled off end
+    if start == end:
+        return True
+    workers = workers or os.cpu_count() or 1
+    states, rows, goal = bytes(grid.states), grid.rows, end.index
+    threshold = heuristic(start.get_position(), end.get_position())
+    cancel = multiprocessing.Event()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(states, rows, goal, heuristic, cancel)) as pool:
+        while True:
+            # expand the paths from the start until there are enough subtrees for the workers
+            prefixes = [[start.index]]
+            minimum = math.inf
+            while prefixes and len(prefixes) < _split_width(workers):
+                expanded = []
+                for prefix in prefixes:
+                    for neighbor in _neighbors(prefix[-1], states, rows):
+                        if neighbor in prefix:
+                            continue
+                        f = len(prefix) + _h(neighbor, goal, rows, heuristic)
+                        if f > threshold:
+                            minimum = min(minimum, f)
+                        elif neighbor == goal:
+                            _mark_path(draw, grid, prefix + [neighbor], start, end)
+                            return True
+                        else:
+                            expanded.append(prefix + [neighbor])
+                if len(expanded) <= len(prefixes) and len(prefixes) > 1:
+                    break # not branching anymore, no point in a deeper split
+                prefixes = expanded
+
+            results = _run_iteration(pool, cancel, _ida_subtree, prefixes, threshold)
+            for path, next_threshold in results:
+                if path is not None:
+                    _mark_path(draw, grid, path, start, end)
+                    return True
+                minimum = min(minimum, next_threshold)
+            if minimum == math.inf:
+                return False
+            threshold = minimum # the next threshold is the smallest f any worker cut off
+
+def iddfs_parallel(draw: callable, grid: Grid, start: Spot, end: Spot, max_depth: int, workers: int | None = None) -> bool:
+    """
+    Iterative Deepening Depth-First Search (IDDFS) Algorithm, with every depth split over worker processes.
+    Args:
+        draw (callable): A function to call to update the Pygame window.
+        grid (Grid): The Grid object containing the spots.
+        start (Spot): The starting spot.
+        end (Spot): The ending spot.
+        max_depth (int): The maximum depth limit for the search.
+        workers (int | None): Number of worker processes, by default the number of CPUs.
+    Returns:
+        bool: True if a path is found, False otherwise.
+    """
+    if start is None or end is None or not grid.is_reachable(start, end):
+        return False # no depth limit can reach a walled off end
+    if start == end:
+        return True
+    workers = workers or os.cpu_count() or 1
+    states, rows, goal = bytes(grid.states), grid.rows, end.index
+    cancel = multiprocessing.Event()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(states, rows, goal, None, cancel)) as pool:
+        for depth in range(1, max_depth + 1):
+            # expand the start breadth-first (every spot once, like dls) into one subtree per spot
+            prefixes = [[start.index]]
+            visited = {start.index}
+            while len(prefixes[0]) - 1 < depth - 1 and len(prefixes) < _split_width(workers):
+                expanded = []
+                for prefix in prefixes:
+                    for neighbor in _neighbors(prefix[-1], states, rows):
+                        if neighbor in visited:
+                            continue
+                        visited.add(neighbor)
+                        if neighbor == goal:
+                            _mark_path(draw, grid, prefix + [neighbor], start, end)
+                            return True
+                        expanded.append(prefix + [neighbor])
+                if not expanded:
+                    break
+                prefixes = expanded
+
+            for path in _run_iteration(pool, cancel, _dls_subtree, prefixes, depth):
+                if path is not None:
+                    _mark_path(draw, grid, path, start, end)
+                    return True
+    return False
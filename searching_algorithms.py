@@ -1,8 +1,34 @@
+from array import array
 from collections import deque
 from queue import PriorityQueue
 from grid import Grid
 from spot import Spot
 
+# The searches keep their flags, costs and parents in the search workspace of the grid (see SearchWorkspace),
+# indexed by Spot.index. The searches that need costs (A*, UCS, IDA*) use the arrays stamped with the
+# generation of the search. The others (BFS, DFS, Greedy, DLS) use a visited bitset and 2-bit parent
+# directions, which take less than half a byte per spot.
+
+def reconstruct_path(draw: callable, grid: Grid, came_from: callable, start: Spot, end: Spot) -> None:
+    """
+    Mark the path found by a search, following the parents from the end back to the start.
+    Args:
+        draw (callable): A function to call to update the Pygame window.
+        grid (Grid): The Grid object containing the spots.
+        came_from (callable): Gives the index of the previous spot on the path from the index of a spot.
+        start (Spot): The starting spot.
+        end (Spot): The ending spot.
+    Returns:
+        None
+    """
+    index = end.index
+    while index != start.index:
+        index = came_from(index)
+        grid.spot_at(index).make_path()
+        draw()
+    end.make_end()
+    start.make_start()
+
 def bfs(draw: callable, grid: Grid, start: Spot, end: Spot) -> bool:
     """
     Breadth-First Search (BFS) Algorithm.
@@ -15,27 +41,25 @@ def bfs(draw: callable, grid: Grid, start: Spot, end: Spot) -> bool:
         bool: True if a path is found, False otherwise.
     """
     if start is None or end is None:
-        return False    
+        return False
+    if not grid.is_reachable(start, end):
+        return False  # end is walled off, no need to explore anything
+    workspace = grid.workspace
+    workspace.clear_visited()
     queue = deque()
     queue.append(start)
-    visited = {start}
-    came_from = {}
+    workspace.set_visited(start.index)
 
     while queue:
         current = queue.popleft()
         if current == end: # if destination found reconstruct path
-            while current in came_from:
-                current = came_from[current]
-                current.make_path()
-                draw()
-            end.make_end()
-            start.make_start()
+            reconstruct_path(draw, grid, workspace.get_parent, start, end)
             return True
         
         for neighbor in current.neighbors:
-            if neighbor not in visited:
-                visited.add(neighbor) # visit the neighbors
-                came_from[neighbor] = current # and add them to path
+            if not workspace.is_visited(neighbor.index):
+                workspace.set_visited(neighbor.index) # visit the neighbors
+                workspace.set_parent(neighbor.index, current.index) # and add them to path
                 queue.append(neighbor) # enqueue to visit later on
                 neighbor.make_open()
     
@@ -56,27 +80,25 @@ def dfs(draw: callable, grid: Grid, start: Spot, end: Spot) -> bool:
         bool: True if a path is found, False otherwise.
     """
     if start is None or end is None:
-        return False    
-    stack = [start]
-    visited = {start}
-    came_from = {}
+        return False
+    if not grid.is_reachable(start, end):
+        return False  # end is walled off, no need to explore anything
+    workspace = grid.workspace
+    workspace.clear_visited()
+    stack = array("i", [start.index]) # indices of the spots, the stack can hold most of the grid
+    workspace.set_visited(start.index)
 
     while stack:
-        current = stack.pop()
+        current = grid.spot_at(stack.pop())
         if current == end: # if destination found reconstruct path
-            while current in came_from:
-                current = came_from[current]
-                current.make_path()
-                draw()
-            end.make_end()
-            start.make_start()
+            reconstruct_path(draw, grid, workspace.get_parent, start, end)
             return True
         
         for neighbor in current.neighbors:
-            if neighbor not in visited:
-                visited.add(neighbor) # visit the neighbors
-                came_from[neighbor] = current # and add them to path
-                stack.append(neighbor) # push to visit later on
+            if not workspace.is_visited(neighbor.index):
+                workspace.set_visited(neighbor.index) # visit the neighbors
+                workspace.set_parent(neighbor.index, current.index) # and add them to path
+                stack.append(neighbor.index) # push to visit later on
                 neighbor.make_open()
     
         draw()
@@ -117,47 +139,41 @@ def astar(draw: callable, grid: Grid, start: Spot, end: Spot, heuristic="Manhatt
     Returns:
         bool: True if a path is found, False otherwise.
     """
+    if start is None or end is None:
+        return False
+    if not grid.is_reachable(start, end):
+        return False  # end is walled off, no need to explore anything
+    # g_score and came_from only count where seen is stamped with this generation (g is "infinite" elsewhere)
+    workspace = grid.workspace
+    generation = workspace.begin()
+    seen, closed, g_score, came_from = workspace.seen, workspace.closed, workspace.g, workspace.parent
     count = 0
     open_heap = PriorityQueue()
     open_heap.put((0, count, start))
-
-    came_from = {}
-    g_score = {}
-    f_score = {}
-
-    for row in grid.grid:
-        for spot in row:
-            g_score[spot] = float("inf")
-            f_score[spot] = float("inf")
-
-    g_score[start] = 0 
-    f_score[start] = heuristic(start.get_position(), end.get_position())
-    open_set = {start}
+    seen[start.index] = generation
+    g_score[start.index] = 0
 
     while not open_heap.empty():
         current = open_heap.get()[2]
-        open_set.remove(current)
+        if closed[current.index] == generation:
+            continue # already expanded through a shorter path
+        closed[current.index] = generation
 
         if current == end:
-            while current in came_from:
-                current = came_from[current]
-                current.make_path()
-                draw()
-            end.make_end()
-            start.make_start()
+            reconstruct_path(draw, grid, came_from.__getitem__, start, end)
             return True
         
         for neighbor in current.neighbors:
-            tentative_g = g_score[current] + 1
-            if tentative_g < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = tentative_g
-                f_score[neighbor] = tentative_g + heuristic(neighbor.get_position(), end.get_position())
-                if neighbor not in open_set:
-                    count += 1
-                    open_heap.put((f_score[neighbor], count, neighbor))
-                    open_set.add(neighbor)
-                    neighbor.make_open()
+            index = neighbor.index
+            tentative_g = g_score[current.index] + 1
+            if seen[index] != generation or tentative_g < g_score[index]:
+                seen[index] = generation
+                came_from[index] = current.index
+                g_score[index] = tentative_g
+                f_score = tentative_g + heuristic(neighbor.get_position(), end.get_position())
+                count += 1
+                open_heap.put((f_score, count, neighbor))
+                neighbor.make_open()
         draw()
         if current != start:
             current.make_closed()
@@ -178,7 +194,7 @@ def dls(draw: callable, grid: Grid, start: Spot, end: Spot, limit: int) -> bool:
     """
     def dls_util(current: Spot, depth: int) -> bool:
         # mark current as visited
-        visited.add(current)
+        workspace.set_visited(current.index)
         if current != start:
             current.make_open()
         draw()
@@ -193,10 +209,10 @@ def dls(draw: callable, grid: Grid, start: Spot, end: Spot, limit: int) -> bool:
             return False
         
         for neighbor in current.neighbors:
-            if neighbor in visited:
+            if workspace.is_visited(neighbor.index):
                 continue
             if dls_util(neighbor, depth - 1):
-                came_from[neighbor] = current
+                workspace.set_parent(neighbor.index, current.index)
                 return True
 
         # finished exploring this branch, mark closed
@@ -208,16 +224,12 @@ def dls(draw: callable, grid: Grid, start: Spot, end: Spot, limit: int) -> bool:
 
     if start is None or end is None:
         return False
-    came_from = {}
-    visited = set()
+    if not grid.is_reachable(start, end):
+        return False  # end is walled off, no need to explore anything
+    workspace = grid.workspace
+    workspace.clear_visited()
     if dls_util(start, limit):
-        current = end
-        while current in came_from:
-            current = came_from[current]
-            current.make_path()
-            draw()
-        end.make_end()
-        start.make_start()
+        reconstruct_path(draw, grid, workspace.get_parent, start, end)
         return True
     return False
 
@@ -233,33 +245,35 @@ def ucs(draw: callable, grid: Grid, start: Spot, end: Spot) -> bool:
         bool: True if a path is found, False otherwise.
     """
     if start is None or end is None:
-        return False    
+        return False
+    if not grid.is_reachable(start, end):
+        return False  # end is walled off, no need to explore anything
+    workspace = grid.workspace
+    generation = workspace.begin()
+    seen, cost_so_far, came_from = workspace.seen, workspace.g, workspace.parent
     count = 0
     open_heap = PriorityQueue()
     open_heap.put((0, count, start))
-    came_from = {}
-    cost_so_far = {start: 0}
+    seen[start.index] = generation
+    cost_so_far[start.index] = 0
 
     while not open_heap.empty():
         current_cost, _, current = open_heap.get()
 
         if current == end:
-            while current in came_from:
-                current = came_from[current]
-                current.make_path()
-                draw()
-            end.make_end()
-            start.make_start()
+            reconstruct_path(draw, grid, came_from.__getitem__, start, end)
             return True
         
         for neighbor in current.neighbors:
-            new_cost = cost_so_far[current] + 1 # each step has a cost of 1
-            if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
-                cost_so_far[neighbor] = new_cost
+            index = neighbor.index
+            new_cost = cost_so_far[current.index] + 1 # each step has a cost of 1
+            if seen[index] != generation or new_cost < cost_so_far[index]:
+                seen[index] = generation
+                cost_so_far[index] = new_cost
                 priority = new_cost
                 count += 1
                 open_heap.put((priority, count, neighbor))
-                came_from[neighbor] = current
+                came_from[index] = current.index
                 neighbor.make_open()
     
         draw()
@@ -279,30 +293,28 @@ def greedy(draw: callable, grid: Grid, start: Spot, end: Spot, heuristic="Manhat
         bool: True if a path is found, False otherwise.
     """
     if start is None or end is None:
-        return False    
+        return False
+    if not grid.is_reachable(start, end):
+        return False  # end is walled off, no need to explore anything
+    workspace = grid.workspace
+    workspace.clear_visited()
     open_heap = PriorityQueue()
     open_heap.put((0, start))
-    came_from = {}
-    visited = {start}
+    workspace.set_visited(start.index)
 
     while not open_heap.empty():
         current = open_heap.get()[1]
 
         if current == end:
-            while current in came_from:
-                current = came_from[current]
-                current.make_path()
-                draw()
-            end.make_end()
-            start.make_start()
+            reconstruct_path(draw, grid, workspace.get_parent, start, end)
             return True
         
         for neighbor in current.neighbors:
-            if neighbor not in visited:
-                visited.add(neighbor)
+            if not workspace.is_visited(neighbor.index):
+                workspace.set_visited(neighbor.index)
                 priority = heuristic(neighbor.get_position(), end.get_position())
                 open_heap.put((priority, neighbor))
-                came_from[neighbor] = current
+                workspace.set_parent(neighbor.index, current.index)
                 neighbor.make_open()
     
         draw()
@@ -322,6 +334,8 @@ def iddfs(draw: callable, grid: Grid, start: Spot, end: Spot, max_depth: int) ->
     Returns:
         bool: True if a path is found, False otherwise.
     """
+    if start is None or end is None or not grid.is_reachable(start, end):
+        return False  # no depth limit can reach a walled off end
     for depth in range(max_depth + 1):
         if dls(draw, grid, start, end, depth):
             return True
@@ -338,7 +352,7 @@ def ida(draw: callable, grid: Grid, start: Spot, end: Spot, heuristic="Manhattan
     Returns:
         bool: True if path found, else False.
     """
-    def search(path: list[Spot], g: float, threshold: float, came_from: dict) -> float | list[Spot]:
+    def search(path: list[Spot], g: float, threshold: float) -> float | list[Spot]:
         """
         Recursive depth-limited A* search.
         Returns either:
@@ -359,27 +373,34 @@ def ida(draw: callable, grid: Grid, start: Spot, end: Spot, heuristic="Manhattan
             draw()
 
         for neighbor in current.neighbors:
-            if neighbor in path:
+            if on_path[neighbor.index] == generation:
                 continue # no cycles allowed
             path.append(neighbor)
-            came_from[neighbor] = current
-            res = search(path, g + 1, threshold, came_from)
+            on_path[neighbor.index] = generation
+            res = search(path, g + 1, threshold)
             if isinstance(res, list): # found a valid path
                 return res
             if res < min_threshold:
                 min_threshold = res
             path.pop()
+            on_path[neighbor.index] = 0
             if neighbor != start and neighbor != end:
                 neighbor.make_closed()
                 draw()
 
         return min_threshold
 
+    if start is None or end is None or not grid.is_reachable(start, end):
+        return False  # no threshold can reach a walled off end
     threshold = heuristic(start.get_position(), end.get_position())
-    came_from = {}
+    # on_path[i] == generation while spot i is on the current path, to check for cycles in O(1)
+    workspace = grid.workspace
+    generation = workspace.begin()
+    on_path = workspace.seen
+    on_path[start.index] = generation
     path = [start]
     while True:
-        res = search(path, 0, threshold, came_from)
+        res = search(path, 0, threshold)
         if isinstance(res, list):
             # reconstruct path
             for spot in res:
@@ -1,32 +1,57 @@
-from utils import COLORS
+from typing import TYPE_CHECKING
+from utils import EMPTY, BARRIER, START, END, OPEN, CLOSED, PATH, STATE_COLORS
 import pygame
 
+if TYPE_CHECKING:
+    from grid import Grid
+
 class Spot:
+    # a spot only keeps its place in the grid, its state code lives in the state array of the grid.
+    # __slots__ removes the per-object __dict__, everything else (pixel geometry, neighbors)
+    # is computed from the grid on demand. Spots are light views created when needed (see Grid.grid),
+    # so two Spot objects at the same place of the same grid are equal.
+    __slots__ = ("grid", "row", "col")
+
     # --- Constructor ---
-    def __init__(self, row: int, col: int, width: int, height: int, total_rows: int):
+    def __init__(self, row: int, col: int, grid: "Grid"):
         """
         Initialize a spot in the grid.
-        Args: 
+        Args:
             row (int): The row index of the spot.
             col (int): The column index of the spot.
-            width (int): The width of the spot.
-            height (int): The height of the spot.
-            total_rows (int): Keeps track of the total number of rows in the grid (while avoiding global variables).
+            grid (Grid): The grid the spot belongs to (used for its size and its neighbors).
         """
-        # a square has a position in the grid (row, col) and a position in the window (x, y)
+        # a square has a position in the grid (row, col), its position and size in the window
+        # are calculated from the camera of the grid when needed.
+        self.grid: "Grid" = grid
         self.row: int = row
         self.col: int = col
-        # a square has also a width and a height
-        # the coordinates (x, y) are calculated based on the place inside the grid and its size.
-        self.width: int = width
-        self.height: int = height
-        self.x: int = row * width
-        self.y: int = col * height
-        self.color: tuple = COLORS["WHITE"]  # default color is white
-        self.neighbors: list = []
-        self.total_rows: int = total_rows
 
-    # ---- Methods to change the state of the spot (i.e., its setters) ----
+    @property
+    def index(self) -> int:
+        """
+        The index of the spot in the state array of the grid (and in the other per-spot arrays).
+        """
+        return self.col * self.grid.rows + self.row
+
+    # ---- State, stored in the state array of the grid ----
+    @property
+    def state(self) -> int:
+        return self.grid.states[self.col * self.grid.rows + self.row]
+
+    @state.setter
+    def state(self, state: int) -> None:
+        grid = self.grid
+        index = self.col * grid.rows + self.row
+        if (grid.states[index] == BARRIER) != (state == BARRIER):
+            grid.barrier_changed_at(index, state == BARRIER)
+        grid.states[index] = state
+
+    @property
+    def color(self) -> tuple:
+        return STATE_COLORS[self.state]
+
+    # ---- Methods to get the state of the spot (i.e., its getters) ----
     def get_position(self) -> tuple[int, int]:
         """
         Gets the (row, col) position of the spot in the grid.
@@ -37,19 +62,19 @@ class Spot:
 
     def is_closed(self) -> bool:
         """
-        Checks if the spot is marked as closed (red) i.e. "Have we already looked at you?".
+        Checks if the spot is marked as closed i.e. "Have we already looked at you?".
         Returns:
-            bool: True if the spot is closed (red), False otherwise.
+            bool: True if the spot is closed, False otherwise.
         """
-        return self.color == COLORS['RED']
+        return self.state == CLOSED
 
     def is_open(self) -> bool:
         """
-        Checks if the spot is marked as open (green), i.e. "Are you free to pass?".
+        Checks if the spot is marked as open, i.e. "Are you free to pass?".
         Returns:
-            bool: True if the spot is marked as open (green), False otherwise.
+            bool: True if the spot is marked as open, False otherwise.
         """
-        return self.color == COLORS['GREEN']
+        return self.state == OPEN
 
     def is_barrier(self) -> bool:
         """
@@ -57,7 +82,7 @@ class Spot:
         Returns:
             bool: True if the spot is a barrier (black), False otherwise.
         """
-        return self.color == COLORS['BLACK']
+        return self.state == BARRIER
 
     def is_start(self) -> bool:
         """
@@ -65,15 +90,15 @@ class Spot:
         Returns:
             bool: True if the spot is the start node (orange), False otherwise.
         """
-        return self.color == COLORS['ORANGE']
+        return self.state == START
 
     def is_end(self) -> bool:
         """
-        Checks if the spot is marked as the end node (turquoise).
+        Checks if the spot is marked as the end node (yellow).
         Returns:
-            bool: True if the spot is the end node (turquoise), False otherwise.
+            bool: True if the spot is the end node (yellow), False otherwise.
         """
-        return self.color == COLORS['TURQUOISE']
+        return self.state == END
 
     # ---- Methods to change the state of the spot (i.e., its setters) ----
     def reset(self) -> None:
@@ -82,23 +107,23 @@ class Spot:
         Returns:
             None
         """
-        self.color = COLORS['WHITE']
+        self.state = EMPTY
 
     def make_closed(self) -> None:
         """
-        Mark the spot as closed (red).
+        Mark the spot as closed (turquoise).
         Returns:
             None
         """
-        self.color = COLORS['TURQUOISE']
+        self.state = CLOSED
 
     def make_open(self) -> None:
         """
-        Mark the spot as open (blue).
+        Mark the spot as open (dark pink).
         Returns:
             None
         """
-        self.color = COLORS['DARK PINK']
+        self.state = OPEN
 
     def make_barrier(self) -> None:
         """
@@ -106,7 +131,7 @@ class Spot:
         Returns:
             None
         """
-        self.color = COLORS['BLACK']
+        self.state = BARRIER
 
     def make_start(self) -> None:
         """
@@ -114,7 +139,7 @@ class Spot:
         Returns:
             None
         """
-        self.color = COLORS['ORANGE']
+        self.state = START
 
     def make_end(self) -> None:
         """
@@ -122,7 +147,7 @@ class Spot:
         Returns:
             None
         """
-        self.color = COLORS['YELLOW']
+        self.state = END
 
     def make_path(self) -> None:
         """
@@ -130,7 +155,7 @@ class Spot:
         Returns:
             None
         """
-        self.color = COLORS['PURPLE']
+        self.state = PATH
 
     # --- Operators ---
     # "Spot" type is not yet defined because the class will be defined at runtime and will exist only after it is closed (the whole class).
@@ -141,7 +166,18 @@ class Spot:
         This is used to avoid errors in data structures that require comparison, like PriorityQueue.
         """
         return False
-    
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Two spots are equal if they are at the same place of the same grid.
+        """
+        if not isinstance(other, Spot):
+            return NotImplemented
+        return self.row == other.row and self.col == other.col and self.grid is other.grid
+
+    def __hash__(self) -> int:
+        return self.index
+
     # --- Other Methods ---
     def draw(self, win: pygame.Surface) -> None:
         """
@@ -149,27 +185,31 @@ class Spot:
         Args:
             win (pygame.Surface): The Pygame surface (window) where the spot will be drawn.
         """
-        # draw a rectangle at (x, y) with size (width, width) and color self.color
-        pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.width))
+        # draw a rectangle where the camera shows the spot, with the color of its state
+        pygame.draw.rect(win, STATE_COLORS[self.state], self.grid.camera.spot_rect(self.row, self.col))
 
-    def update_neighbors(self, grid: list[list["Spot"]]) -> None:
+    @property
+    def neighbors(self) -> list["Spot"]:
         """
-        Update the list of neighbor spots that are not barriers.
-        Args:
-            grid (list[list[Spot]]): The 2D list (matrix) representing the grid of Spot objects.
+        The neighbor spots that are not barriers, computed from the grid on demand
+        (so there is no list to keep up to date when barriers change).
         Returns:
-            None
+            list[Spot]: The neighbors of the spot, in the order down, up, right, left.
         """
-        self.neighbors = []
+        grid, states, rows = self.grid, self.grid.states, self.grid.rows
+        row, col = self.row, self.col
+        index = col * rows + row
+        neighbors = []
         # DOWN
-        if self.row < self.total_rows - 1 and not grid[self.row + 1][self.col].is_barrier():
-            self.neighbors.append(grid[self.row + 1][self.col])
+        if row < rows - 1 and states[index + 1] != BARRIER:
+            neighbors.append(Spot(row + 1, col, grid))
         # UP
-        if self.row > 0 and not grid[self.row - 1][self.col].is_barrier():
-            self.neighbors.append(grid[self.row - 1][self.col])
+        if row > 0 and states[index - 1] != BARRIER:
+            neighbors.append(Spot(row - 1, col, grid))
         # RIGHT
-        if self.col < self.total_rows - 1 and not grid[self.row][self.col + 1].is_barrier():
-            self.neighbors.append(grid[self.row][self.col + 1])
+        if col < grid.cols - 1 and states[index + rows] != BARRIER:
+            neighbors.append(Spot(row, col + 1, grid))
         # LEFT
-        if self.col > 0 and not grid[self.row][self.col - 1].is_barrier():
-            self.neighbors.append(grid[self.row][self.col - 1])
+        if col > 0 and states[index - rows] != BARRIER:
+            neighbors.append(Spot(row, col - 1, grid))
+        return neighbors
@@ -19,3 +19,22 @@ COLORS = {
     'DARK PINK': (255, 20, 147),  
     'PINK': (255, 192, 203)        # background color      
 }
+
+# states of a spot, stored as small integer codes instead of colors.
+# STATE_COLORS maps each code to the color it is drawn with.
+EMPTY = 0       # unvisited nodes
+BARRIER = 1     # barrier
+START = 2       # start node
+END = 3         # end node
+OPEN = 4        # open nodes
+CLOSED = 5      # closed nodes
+PATH = 6        # path
+STATE_COLORS = (
+    COLORS['WHITE'],
+    COLORS['BLACK'],
+    COLORS['ORANGE'],
+    COLORS['YELLOW'],
+    COLORS['DARK PINK'],
+    COLORS['TURQUOISE'],
+    COLORS['PURPLE'],
+)